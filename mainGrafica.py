@@ -1,29 +1,43 @@
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import os
 import tempfile
 import asyncio
 import threading
-import time
 import re
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
-import fitz  # PyMuPDF
-import docx  # python-docx
-import edge_tts
-from pydub import AudioSegment
-import pygame
-import concurrent.futures
-import math
-from tqdm import tqdm
 import hashlib
+import subprocess
+import concurrent.futures
 import pickle
 import queue
 from functools import lru_cache
 import gc
 from pathlib import Path
 
+# Dependências pesadas (fitz, docx, edge_tts, pydub, pygame, tqdm) são importadas
+# apenas quando usadas, para que a janela apareça rapidamente.
+STARTUP_TIME_BUDGET = 1.5  # segundos até a janela ficar visível
+
+# Perfis de exportação: cada formato tem seu próprio encoder, bitrate e taxa de amostragem.
+# A taxa é fixada porque a aceleração deixa o áudio em taxas como 33600 Hz,
+# que esses encoders não aceitam diretamente.
+EXPORT_PROFILES = {
+    "mp3": {"ext": ".mp3", "codec": "libmp3lame", "bitrate": "128k", "sample_rate": 44100, "args": []},  # players antigos
+    "opus": {"ext": ".opus", "codec": "libopus", "bitrate": "32k", "sample_rate": 48000, "args": ["-application", "voip"]},  # mobile
+    "m4a": {"ext": ".m4a", "codec": "aac", "bitrate": "96k", "sample_rate": 44100, "args": ["-movflags", "+faststart"]},  # podcasts
+}
+REQUIRED_EXPORT_FORMAT = "mp3"  # falha no MP3 interrompe a geração; nos demais só gera aviso
+# O pydub guarda amostras de 8 bits com sinal (converte o u8 do WAV ao carregar)
+PCM_FORMATS = {1: "s8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
 # === Funções de Extração de Texto ===
 def extract_text(filepath):
     """Extrai texto de arquivos PDF, TXT e DOCX com feedback de progresso."""
+    from tqdm import tqdm
+
     ext = os.path.splitext(filepath)[1].lower()
     text = ""
     
@@ -31,6 +45,7 @@ def extract_text(filepath):
     start_time = time.time()
     
     if ext == ".pdf":
+        import fitz  # PyMuPDF
         doc = fitz.open(filepath)
         total_pages = len(doc)
         print(f"📄 PDF com {total_pages} páginas")
@@ -45,6 +60,7 @@ def extract_text(filepath):
             text = f.read()
             
     elif ext == ".docx":
+        import docx  # python-docx
         doc = docx.Document(filepath)
         paragraphs = list(doc.paragraphs)
         print(f"📑 DOCX com {len(paragraphs)} parágrafos")
@@ -61,9 +77,8 @@ def extract_text(filepath):
     
     return text.strip()
 
-def print_performance_stats(text_length, processing_time, output_file, chunks_processed=0, cache_hits=0):
+def print_performance_stats(text_length, processing_time, output_files, chunks_processed=0, cache_hits=0):
     """Exibe estatísticas de performance do processamento."""
-    file_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
     chars_per_second = text_length / processing_time if processing_time > 0 else 0
     
     print("\n" + "="*60)
@@ -72,8 +87,9 @@ def print_performance_stats(text_length, processing_time, output_file, chunks_pr
     print(f"📝 Caracteres processados: {text_length:,}")
     print(f"⏱️  Tempo total: {processing_time:.2f} segundos")
     print(f"🚀 Velocidade: {chars_per_second:.0f} chars/segundo")
-    print(f"📁 Arquivo gerado: {os.path.basename(output_file)}")
-    print(f"💾 Tamanho do áudio: {file_size:.2f} MB")
+    for output_file in output_files.values():
+        file_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
+        print(f"📁 Arquivo gerado: {os.path.basename(output_file)} ({file_size:.2f} MB)")
     if chunks_processed > 0:
         print(f"🧩 Chunks processados: {chunks_processed}")
         print(f"⚡ Cache hits: {cache_hits}")
@@ -85,9 +101,9 @@ class AudioCache:
     """Cache inteligente para chunks de áudio processados."""
     def __init__(self, cache_dir=".audio_cache", max_size_mb=100):
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
         self.max_size_mb = max_size_mb
         self.cache_stats = {"hits": 0, "misses": 0}
+        self._cleanup_lock = threading.Lock()
     
     def _get_cache_key(self, text, voice, speed):
         """Gera chave única para o cache."""
@@ -117,6 +133,7 @@ class AudioCache:
         cache_file = self.cache_dir / f"{cache_key}.pkl"
         
         try:
+            self.cache_dir.mkdir(exist_ok=True)
             with open(cache_file, 'wb') as f:
                 pickle.dump(audio_data, f)
         except:
@@ -127,14 +144,24 @@ class AudioCache:
         if not self.cache_dir.exists():
             return
         
-        total_size = sum(f.stat().st_size for f in self.cache_dir.glob("*.pkl"))
-        if total_size > self.max_size_mb * 1024 * 1024:
-            # Remove arquivos mais antigos
-            files = [(f, f.stat().st_mtime) for f in self.cache_dir.glob("*.pkl")]
-            files.sort(key=lambda x: x[1])
+        # Evita limpezas simultâneas (thread de manutenção e encerramento)
+        with self._cleanup_lock:
+            # Um único stat por arquivo serve para tamanho e idade
+            files = []
+            for f in self.cache_dir.glob("*.pkl"):
+                try:
+                    st = f.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((f, st.st_size, st.st_mtime))
             
-            for f, _ in files[:len(files)//2]:  # Remove metade dos arquivos mais antigos
-                f.unlink()
+            total_size = sum(size for _, size, _ in files)
+            if total_size > self.max_size_mb * 1024 * 1024:
+                # Remove arquivos mais antigos
+                files.sort(key=lambda x: x[2])
+                
+                for f, _, _ in files[:len(files)//2]:  # Remove metade dos arquivos mais antigos
+                    f.unlink(missing_ok=True)
 
 # Instância global do cache
 audio_cache = AudioCache()
@@ -163,6 +190,7 @@ tts_pool = TTSConnectionPool()
 @lru_cache(maxsize=1)
 async def list_voices():
     """Lista vozes com cache para evitar requisições repetidas."""
+    import edge_tts
     voices = await edge_tts.VoicesManager.create()
     ptb_voices = [v for v in voices.voices if "pt-BR" in v["Locale"]]
     return ptb_voices
@@ -176,6 +204,9 @@ async def generate_audio_single(text, voice_name, output_path, speed=1.4, play_p
     Gera áudio de um bloco de texto.
     Se play_preview=True, apenas reproduz o áudio sem salvar.
     """
+    import edge_tts
+    from pydub import AudioSegment
+
     tmp_mp3 = tempfile.mktemp(suffix=".mp3")
     try:
         communicate = edge_tts.Communicate(text, voice_name)
@@ -184,6 +215,7 @@ async def generate_audio_single(text, voice_name, output_path, speed=1.4, play_p
         sound = sound._spawn(sound.raw_data, overrides={"frame_rate": int(sound.frame_rate * speed)})
         sound = sound.set_frame_rate(sound.frame_rate)
         if play_preview:
+            import pygame
             pygame.mixer.init()
             pygame.mixer.music.load(tmp_mp3)
             pygame.mixer.music.play()
@@ -232,6 +264,9 @@ async def generate_audio_chunk_optimized(chunk, voice_name, speed=1.4, chunk_id=
     if cached_audio:
         return cached_audio
     
+    import edge_tts
+    from pydub import AudioSegment
+
     # Adquire conexão do pool
     await tts_pool.acquire()
     
@@ -272,10 +307,112 @@ def process_chunk_batch(chunks_batch, voice_name, speed, batch_id):
     
     return results
 
-async def generate_audio(text, voice_name, output_path, speed=1.4, progress_callback=None):
+def export_multi_format(sound, output_path, formats=("mp3",), chunk_size=256 * 1024):
+    """
+    Exporta o mesmo áudio em vários formatos de uma só vez.
+    O PCM final é enviado em blocos para um processo ffmpeg por formato,
+    todos rodando em paralelo, e o tempo total fica próximo ao do encoder mais lento.
+    Se o MP3 falhar, remove todos os arquivos gerados e levanta RuntimeError;
+    falhas nos formatos extras só geram aviso e o arquivo parcial é removido.
+    Retorna {formato: caminho} apenas com os formatos exportados.
+    """
+    from pydub import AudioSegment
+
+    if not formats:
+        raise ValueError("❌ Nenhum formato de exportação informado.")
+
+    pcm = memoryview(sound.raw_data)
+    audio_seconds = len(sound) / 1000
+    base = os.path.splitext(output_path)[0]
+    input_args = [
+        "-f", PCM_FORMATS[sound.sample_width],
+        "-ar", str(sound.frame_rate),
+        "-ac", str(sound.channels),
+        "-i", "pipe:0",
+    ]
+
+    def run_encoder(cmd):
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        # Lê stderr em paralelo para o ffmpeg não travar com o pipe cheio
+        stderr_chunks = []
+        reader = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        reader.start()
+        try:
+            for offset in range(0, len(pcm), chunk_size):
+                proc.stdin.write(pcm[offset:offset + chunk_size])
+        except BrokenPipeError:
+            pass  # o ffmpeg encerrou antes; o erro aparece no código de saída
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = proc.wait()
+        reader.join()
+        return returncode, b"".join(stderr_chunks).decode(errors="ignore").strip()
+
+    def encode(fmt):
+        profile = EXPORT_PROFILES[fmt]
+        path = output_path if fmt == "mp3" else base + profile["ext"]
+        cmd = [AudioSegment.converter, "-y", "-loglevel", "error", *input_args,
+               "-vn", "-c:a", profile["codec"], "-b:a", profile["bitrate"],
+               "-ar", str(profile["sample_rate"]), *profile["args"], path]
+        start = time.time()
+        try:
+            returncode, error = run_encoder(cmd)
+        except Exception as e:
+            returncode, error = None, str(e)
+        elapsed = time.time() - start
+        if returncode != 0:
+            # Não deixa arquivo pela metade no disco
+            if os.path.exists(path):
+                os.remove(path)
+            raise RuntimeError(f"Falha ao exportar {fmt.upper()}: {error or f'código {returncode}'}")
+        return fmt, path, elapsed
+
+    start_time = time.time()
+    results = {}
+    errors = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = {executor.submit(encode, fmt): fmt for fmt in formats}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                fmt, path, elapsed = future.result()
+            except Exception as e:
+                errors[futures[future]] = str(e)
+                continue
+            results[fmt] = (path, elapsed)
+
+    if REQUIRED_EXPORT_FORMAT in errors or not results:
+        # A geração falhou: remove também os formatos que chegaram a ser exportados
+        for path, _ in results.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise RuntimeError("\n".join(errors.values()))
+
+    # Mantém a ordem pedida, não a ordem de término dos encoders
+    exported = {}
+    for fmt in formats:
+        if fmt not in results:
+            continue
+        path, elapsed = results[fmt]
+        exported[fmt] = path
+        speed_factor = audio_seconds / elapsed if elapsed > 0 else 0
+        pcm_rate = len(pcm) / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        print(f"🎚️ {fmt.upper()} ({EXPORT_PROFILES[fmt]['bitrate']}): {elapsed:.2f}s - "
+              f"{speed_factor:.0f}x tempo real, {pcm_rate:.1f} MB/s de PCM")
+    for error in errors.values():
+        print(f"⚠️ {error}")
+    print(f"📦 {len(exported)} formato(s) exportado(s) em {time.time() - start_time:.2f}s")
+    return exported
+
+async def generate_audio(text, voice_name, output_path, speed=1.4, progress_callback=None, formats=("mp3",)):
     """
     Gera áudio ultra-otimizado com processamento em lotes e cache inteligente.
+    O resultado é exportado em paralelo em cada formato de `formats`.
     """
+    from pydub import AudioSegment
+
     start_time = time.time()
     
     # Remove quebras de linha extras e limpa o texto
@@ -326,14 +463,14 @@ async def generate_audio(text, voice_name, output_path, speed=1.4, progress_call
     if progress_callback:
         progress_callback("Exportando arquivo final...")
     
-    # Exporta com compressão otimizada
-    combined.export(output_path, format="mp3", bitrate="128k")
+    # Exporta todos os formatos a partir do mesmo PCM
+    exported = export_multi_format(combined, output_path, formats)
     
     processing_time = time.time() - start_time
-    print(f"✅ Áudio gerado com sucesso: {output_path}")
+    print(f"✅ Áudio gerado com sucesso: {', '.join(exported.values())}")
     print(f"⚡ Cache hits: {cache_hits}/{total_processed} ({(cache_hits/total_processed)*100:.1f}%)")
     
-    return processing_time, total_processed, cache_hits
+    return processing_time, total_processed, cache_hits, exported
 
 # === Dividir por Capítulos ===
 def split_by_chapters(text):
@@ -397,6 +534,15 @@ class TextToAudioGUI:
         self.chapter_var = tk.BooleanVar()
         tk.Checkbutton(root, text="Dividir por capítulos", variable=self.chapter_var).pack(anchor="w", padx=10, pady=(5,10))
 
+        # Formatos extras (MP3 é sempre gerado)
+        self.format_frame = tk.Frame(root)
+        self.format_frame.pack(anchor="w", padx=10, pady=(0,10))
+        tk.Label(self.format_frame, text="Exportar também:").pack(side="left")
+        self.opus_var = tk.BooleanVar()
+        tk.Checkbutton(self.format_frame, text="Opus (32k)", variable=self.opus_var).pack(side="left", padx=5)
+        self.m4a_var = tk.BooleanVar()
+        tk.Checkbutton(self.format_frame, text="M4A (96k)", variable=self.m4a_var).pack(side="left", padx=5)
+
         # Gerar áudio
         self.generate_btn = tk.Button(root, text="🎧 Gerar Áudio", command=self.start_generate)
         self.generate_btn.pack(pady=5)
@@ -447,12 +593,17 @@ class TextToAudioGUI:
             return
         speed = float(self.speed_var.get())
         divide_chapters = self.chapter_var.get()
+        formats = ["mp3"]
+        if self.opus_var.get():
+            formats.append("opus")
+        if self.m4a_var.get():
+            formats.append("m4a")
         out_name = os.path.splitext(os.path.basename(self.file_entry.get()))[0] + f"_output_{speed}x.mp3"
         threading.Thread(target=self.generate_audio_thread,
-                         args=(self.text, self.selected_voice, out_name, speed, divide_chapters),
+                         args=(self.text, self.selected_voice, out_name, speed, divide_chapters, tuple(formats)),
                          daemon=True).start()
 
-    def generate_audio_thread(self, text, voice, output_path, speed, divide_chapters):
+    def generate_audio_thread(self, text, voice, output_path, speed, divide_chapters, formats=("mp3",)):
         self.progress['value'] = 0
         self.progress.update()
         self.audio_done = False
@@ -499,18 +650,23 @@ class TextToAudioGUI:
                 full_text = ""
                 for _, content in chapters:
                     full_text += content + "\n"
-                processing_time, chunks_processed, cache_hits = asyncio.run(generate_audio(full_text, voice, output_path, speed, progress_callback))
+                processing_time, chunks_processed, cache_hits, exported = asyncio.run(generate_audio(full_text, voice, output_path, speed, progress_callback, formats))
             else:
-                processing_time, chunks_processed, cache_hits = asyncio.run(generate_audio(text, voice, output_path, speed, progress_callback))
+                processing_time, chunks_processed, cache_hits, exported = asyncio.run(generate_audio(text, voice, output_path, speed, progress_callback, formats))
             
             text_length = len(text)
             
             # Exibe estatísticas no console
-            print_performance_stats(text_length, processing_time, output_path, chunks_processed, cache_hits)
+            print_performance_stats(text_length, processing_time, exported, chunks_processed, cache_hits)
             
             self.audio_done = True
             cache_efficiency = (cache_hits/chunks_processed)*100 if chunks_processed > 0 else 0
-            messagebox.showinfo("Pronto!", f"Áudio gerado: {output_path}\\n\\nProcessado {text_length:,} caracteres em {processing_time:.2f}s\\nCache: {cache_hits}/{chunks_processed} ({cache_efficiency:.1f}%)")
+            failed = [fmt.upper() for fmt in formats if fmt not in exported]
+            if failed:
+                messagebox.showwarning("Formatos não exportados",
+                                       f"Não foi possível exportar: {', '.join(failed)}.\nDetalhes no console.")
+            files = "\n".join(os.path.basename(path) for path in exported.values())
+            messagebox.showinfo("Pronto!", f"Áudio gerado:\n{files}\n\nProcessado {text_length:,} caracteres em {processing_time:.2f}s\nCache: {cache_hits}/{chunks_processed} ({cache_efficiency:.1f}%)")
         except Exception as e:
             self.audio_done = True
             messagebox.showerror("Erro ao gerar áudio", str(e))
@@ -520,8 +676,8 @@ def initialize_system():
     """Inicializa o sistema com otimizações."""
     print("🚀 Inicializando sistema otimizado...")
     
-    # Limpa cache antigo
-    audio_cache.cleanup()
+    # A limpeza do cache fica para start_background_maintenance(),
+    # depois que a janela já estiver visível.
     
     # Configura garbage collection
     gc.set_threshold(700, 10, 10)
@@ -530,6 +686,22 @@ def initialize_system():
     print(f"📁 Cache: {audio_cache.cache_dir}")
     print(f"🔗 Pool de conexões: {tts_pool.max_connections} conexões máximas")
 
+def report_startup_time():
+    """Mede o tempo até a janela ficar visível e avisa sobre regressões."""
+    startup_time = time.perf_counter() - _STARTUP_T0
+    print(f"⏱️  Janela pronta em {startup_time:.2f}s")
+    if startup_time > STARTUP_TIME_BUDGET:
+        print(f"⚠️ Inicialização acima do limite de {STARTUP_TIME_BUDGET:.1f}s - "
+              "verifique imports pesados no carregamento do módulo")
+    return startup_time
+
+def start_background_maintenance(root):
+    """Agenda a manutenção do cache em segundo plano após a janela aparecer."""
+    def on_window_ready():
+        report_startup_time()
+        threading.Thread(target=audio_cache.cleanup, daemon=True).start()
+    root.after_idle(on_window_ready)
+
 def cleanup_system():
     """Limpa recursos do sistema."""
     print("🧹 Limpando recursos do sistema...")
@@ -543,6 +715,7 @@ if __name__ == "__main__":
         initialize_system()
         root = tk.Tk()
         app = TextToAudioGUI(root)
+        start_background_maintenance(root)
         root.mainloop()
     finally:
         cleanup_system()
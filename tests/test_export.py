@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pydub = pytest.importorskip("pydub")
+from pydub.generators import Sine
+
+import mainGrafica
+
+HAS_FFMPEG = shutil.which(pydub.AudioSegment.converter) is not None
+
+# Encoder falso: copia o PCM para o arquivo de saída e falha para "codec_inexistente"
+STUB_ENCODER = f"""#!{sys.executable}
+import sys
+args = sys.argv[1:]
+data = sys.stdin.buffer.read()
+if args[args.index("-c:a") + 1] == "codec_inexistente":
+    sys.stderr.write("Unknown encoder")
+    sys.exit(1)
+with open(args[-1], "wb") as f:
+    f.write(data)
+"""
+
+
+@pytest.fixture
+def stub_encoder(tmp_path, monkeypatch):
+    if os.name == "nt":
+        pytest.skip("encoder falso depende de shebang")
+    stub = tmp_path / "ffmpeg_falso"
+    stub.write_text(STUB_ENCODER)
+    stub.chmod(0o755)
+    monkeypatch.setattr(pydub.AudioSegment, "converter", str(stub))
+    output_dir = tmp_path / "saida"
+    output_dir.mkdir()
+    return output_dir
+
+
+def _break_codec(monkeypatch, fmt):
+    monkeypatch.setitem(mainGrafica.EXPORT_PROFILES, fmt,
+                        {**mainGrafica.EXPORT_PROFILES[fmt], "codec": "codec_inexistente"})
+
+
+def _sped_up_tone(sample_width=2):
+    # Mesmo truque de aceleração do generate_audio: 24000 Hz * 1.4 = 33600 Hz
+    sound = Sine(440).to_audio_segment(duration=500).set_frame_rate(24000)
+    sound = sound.set_channels(1).set_sample_width(sample_width)
+    return sound._spawn(sound.raw_data, overrides={"frame_rate": 33600})
+
+
+@pytest.mark.skipif(not HAS_FFMPEG, reason="ffmpeg não encontrado")
+@pytest.mark.parametrize("sample_width", [1, 2])
+def test_exports_every_format(tmp_path, sample_width):
+    output_path = str(tmp_path / "saida.mp3")
+    exported = mainGrafica.export_multi_format(_sped_up_tone(sample_width), output_path, ("mp3", "opus", "m4a"))
+
+    assert list(exported) == ["mp3", "opus", "m4a"]
+    assert exported["mp3"] == output_path
+    for fmt, path in exported.items():
+        assert Path(path).suffix == mainGrafica.EXPORT_PROFILES[fmt]["ext"]
+        assert Path(path).stat().st_size > 0
+
+
+def test_returns_formats_in_requested_order(stub_encoder):
+    output_path = str(stub_encoder / "saida.mp3")
+    exported = mainGrafica.export_multi_format(_sped_up_tone(), output_path, ("m4a", "mp3", "opus"))
+
+    assert list(exported) == ["m4a", "mp3", "opus"]
+    for path in exported.values():
+        assert Path(path).stat().st_size > 0
+
+
+def test_failed_extra_format_is_dropped_and_cleaned_up(stub_encoder, monkeypatch):
+    _break_codec(monkeypatch, "opus")
+    exported = mainGrafica.export_multi_format(_sped_up_tone(), str(stub_encoder / "saida.mp3"), ("mp3", "opus", "m4a"))
+
+    assert list(exported) == ["mp3", "m4a"]
+    assert sorted(p.name for p in stub_encoder.iterdir()) == ["saida.m4a", "saida.mp3"]
+
+
+def test_failed_mp3_raises_and_removes_every_output(stub_encoder, monkeypatch, capsys):
+    _break_codec(monkeypatch, "mp3")
+    with pytest.raises(RuntimeError, match="MP3"):
+        mainGrafica.export_multi_format(_sped_up_tone(), str(stub_encoder / "saida.mp3"), ("mp3", "opus", "m4a"))
+
+    assert not (stub_encoder / "saida.mp3").exists()
+    assert not (stub_encoder / "saida.opus").exists()
+    assert not (stub_encoder / "saida.m4a").exists()
+    assert "🎚️" not in capsys.readouterr().out
+
+
+def test_empty_formats_raises(tmp_path):
+    with pytest.raises(ValueError):
+        mainGrafica.export_multi_format(_sped_up_tone(), str(tmp_path / "saida.mp3"), ())
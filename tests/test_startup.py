@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ["fitz", "docx", "edge_tts", "pydub", "pygame", "tqdm"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import mainGrafica
+elapsed = time.perf_counter() - start
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded, "budget": mainGrafica.STARTUP_TIME_BUDGET}}))
+"""
+
+
+def _import_probe(tmp_path):
+    # Roda num processo limpo e fora do repositório para não criar .audio_cache
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_heavy_dependencies(tmp_path):
+    probe = _import_probe(tmp_path)
+    assert probe["loaded"] == []
+
+
+def test_import_is_fast_and_has_no_side_effects(tmp_path):
+    probe = _import_probe(tmp_path)
+    assert probe["elapsed"] < probe["budget"]
+    assert not (tmp_path / ".audio_cache").exists()